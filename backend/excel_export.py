@@ -2,54 +2,62 @@ from __future__ import annotations
 
 from datetime import datetime
 from io import BytesIO
-from typing import Iterable
+from typing import Iterable, Iterator, Tuple
 
-from openpyxl import Workbook
-from openpyxl.styles import Alignment, Font
+import xlsxwriter
 
 from .storage import AnalysisResult
 
+LINE_ROW = 'line'
+AVERAGE_ROW = 'average'
 
-def export_results_to_excel(results: Iterable[AnalysisResult]) -> BytesIO:
-    workbook = Workbook()
-    worksheet = workbook.active
-    worksheet.title = 'MLI Summary'
-
-    header_font = Font(bold=True)
-    center_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+HEADERS = ('Animal', 'Image #', 'Line #', 'Horizontal Intercepts', 'Vertical Intercepts', 'MLI (µm)')
+HEADER_FORMAT = {'bold': True, 'align': 'center', 'valign': 'vcenter', 'text_wrap': True}
+BOLD_FORMAT = {'bold': True}
 
-    headers = ['Animal', 'Image #', 'Line #', 'Horizontal Intercepts', 'Vertical Intercepts', 'MLI (µm)']
-    worksheet.append(headers)
-    for column_index, header in enumerate(headers, start=1):
-        cell = worksheet.cell(row=1, column=column_index)
-        cell.font = header_font
-        cell.alignment = center_alignment
 
-    row_index = 2
+def _flatten_rows(results: Iterable[AnalysisResult]) -> Iterator[Tuple[str, tuple]]:
     for animal_index, result in enumerate(results, start=1):
         animal_label = f'Animal {animal_index}'
         for image in result.images:
+            image_number = image.image_number
             for line in image.lines:
-                worksheet.cell(row=row_index, column=1, value=animal_label)
-                worksheet.cell(row=row_index, column=2, value=image.image_number)
-                worksheet.cell(row=row_index, column=3, value=line.line_number)
-                worksheet.cell(row=row_index, column=4, value=line.horizontal_intercepts)
-                worksheet.cell(row=row_index, column=5, value=line.vertical_intercepts)
-                worksheet.cell(row=row_index, column=6, value=line.mean_linear_intercept_um)
-                row_index += 1
+                yield LINE_ROW, (
+                    animal_label,
+                    image_number,
+                    line.line_number,
+                    line.horizontal_intercepts,
+                    line.vertical_intercepts,
+                    line.mean_linear_intercept_um,
+                )
+            yield AVERAGE_ROW, (f'{animal_label} - Image {image_number} average', image.average_mli_um)
 
-            worksheet.cell(row=row_index, column=1, value=f'{animal_label} - Image {image.image_number} average')
-            worksheet.merge_cells(start_row=row_index, start_column=1, end_row=row_index, end_column=3)
-            worksheet.cell(row=row_index, column=6, value=image.average_mli_um)
-            worksheet.cell(row=row_index, column=6).font = header_font
-            row_index += 1
 
-    for column in range(1, 7):
-        worksheet.column_dimensions[chr(ord('A') + column - 1)].width = 26
+def export_results_to_excel(results: Iterable[AnalysisResult]) -> BytesIO:
+    stream = BytesIO()
+    workbook = xlsxwriter.Workbook(stream, {'constant_memory': True})
+    worksheet = workbook.add_worksheet('MLI Summary')
 
-    worksheet.cell(row=row_index + 1, column=1, value=f'Generated: {datetime.utcnow().isoformat()}Z')
+    header_format = workbook.add_format(HEADER_FORMAT)
+    bold_format = workbook.add_format(BOLD_FORMAT)
 
-    stream = BytesIO()
-    workbook.save(stream)
+    worksheet.set_column(0, 5, 26)
+
+    worksheet.write_row(0, 0, HEADERS, header_format)
+
+    write_row = worksheet.write_row
+    row_index = 1
+    for kind, row in _flatten_rows(results):
+        if kind is LINE_ROW:
+            write_row(row_index, 0, row)
+        else:
+            label, average_mli_um = row
+            worksheet.merge_range(row_index, 0, row_index, 2, label)
+            worksheet.write(row_index, 5, average_mli_um, bold_format)
+        row_index += 1
+
+    worksheet.write(row_index + 1, 0, f'Generated: {datetime.utcnow().isoformat()}Z')
+
+    workbook.close()
     stream.seek(0)
     return stream
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
-import shutil
+import asyncio
+import os
+import platform
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
 from dataclasses import asdict
 from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import AsyncIterator, BinaryIO, Dict, List
 
 if __package__ is None or __package__ == '':
     import sys
@@ -15,12 +21,14 @@ if __package__ is None or __package__ == '':
         sys.path.insert(0, str(parent_dir))
     __package__ = current_dir.name
 
+import aiofiles
 from fastapi import Depends, FastAPI, File, Form, HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse, ORJSONResponse, Response, StreamingResponse
 
 from .excel_export import export_results_to_excel
-from .mli_analysis import AnalysisConfigData, ImageProcessingError, run_mli_analysis
+from .mli_analysis import AnalysisConfigData, ImageProcessingError, evict_cached_image, run_mli_analysis
 from .models import (
     AnalysisConfigModel,
     AnalysisImageResultModel,
@@ -29,9 +37,9 @@ from .models import (
     ClearResultsResponseModel,
     DeleteImageResponseModel,
     ImageUploadResponseModel,
-    LineResultModel,
     MoveImageRequestModel,
     MoveImageResponseModel,
+    OverlayKind,
     PreviewAnalysisRequestModel,
     UploadResponseModel,
 )
@@ -40,11 +48,37 @@ from .storage import AnalysisImageResult, AnalysisResult, LineResult, StateManag
 BASE_DIR = Path(__file__).resolve().parent
 UPLOADS_DIR = BASE_DIR / 'uploads'
 RESULTS_DIR = BASE_DIR / 'results'
+UPLOAD_CHUNK_SIZE = 1 << 20
+SENDFILE_SUPPORTED = platform.system() == 'Linux' and hasattr(os, 'sendfile')
 
 UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
 RESULTS_DIR.mkdir(parents=True, exist_ok=True)
 
-app = FastAPI(title='MLI Analysis API', version='1.0.0')
+ANALYSIS_MAX_WORKERS = min(os.cpu_count() or 1, 4)
+analysis_executor = ProcessPoolExecutor(max_workers=ANALYSIS_MAX_WORKERS)
+
+
+def _replace_broken_executor(broken: ProcessPoolExecutor) -> None:
+    # A worker that dies (OOM kill, native crash) breaks the whole pool, so start a fresh one for later requests.
+    global analysis_executor
+    if analysis_executor is broken:
+        analysis_executor = ProcessPoolExecutor(max_workers=ANALYSIS_MAX_WORKERS)
+        broken.shutdown(wait=False, cancel_futures=True)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    yield
+    analysis_executor.shutdown()
+    state_manager.close()
+
+
+app = FastAPI(
+    title='MLI Analysis API',
+    version='1.0.0',
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=['*'],
@@ -55,6 +89,71 @@ app.add_middleware(
 
 state_manager = StateManager(RESULTS_DIR)
 
+ANALYSIS_SCOPE = 'images'
+PREVIEW_SCOPE = 'preview'
+OVERLAY_CACHE_LIMIT = 32
+overlay_cache: Dict[str, bytes] = {}
+
+
+def _overlay_key(scope: str, image_id: str, kind: str) -> str:
+    return f'{scope}/{image_id}/{kind}'
+
+
+def _overlay_url(scope: str, image_id: str, kind: str, version: str) -> str:
+    return f'/{scope}/{image_id}/{kind}.png?v={version}'
+
+
+def _cache_overlay(scope: str, image_id: str, kind: str, png: bytes) -> None:
+    key = _overlay_key(scope, image_id, kind)
+    overlay_cache.pop(key, None)
+    overlay_cache[key] = png
+    while len(overlay_cache) > OVERLAY_CACHE_LIMIT:
+        overlay_cache.pop(next(iter(overlay_cache)))
+
+
+def _discard_overlays(scope: str, image_id: str | None = None) -> None:
+    prefix = f'{scope}/' if image_id is None else f'{scope}/{image_id}/'
+    for key in [key for key in overlay_cache if key.startswith(prefix)]:
+        del overlay_cache[key]
+
+
+def _png_response(png: bytes) -> Response:
+    return Response(content=png, media_type='image/png')
+
+
+def _image_result_payload(image: AnalysisImageResult, version: str) -> Dict[str, object]:
+    return {
+        'image_id': image.image_id,
+        'image_number': image.image_number,
+        'name': image.name,
+        'average_mli_um': image.average_mli_um,
+        'processed_image_url': _overlay_url(ANALYSIS_SCOPE, image.image_id, OverlayKind.processed.value, version),
+        'threshold_image_url': _overlay_url(ANALYSIS_SCOPE, image.image_id, OverlayKind.threshold.value, version),
+        'lines': [asdict(line) for line in image.lines],
+    }
+
+
+def _result_payload(result: AnalysisResult) -> Dict[str, object]:
+    return {
+        'animal_id': result.animal_id,
+        'generated_at': result.generated_at,
+        'images': [_image_result_payload(image, result.generated_at) for image in result.images],
+    }
+
+
+def _sendfile_upload(source: BinaryIO, destination: Path) -> None:
+    source.flush()
+    source_fd = source.fileno()
+    remaining = os.fstat(source_fd).st_size
+    offset = 0
+    with destination.open('wb') as destination_file:
+        while remaining > 0:
+            sent = os.sendfile(destination_file.fileno(), source_fd, offset, remaining)
+            if sent == 0:
+                break
+            offset += sent
+            remaining -= sent
+
 
 def parse_analysis_config(
     scaleUmPerPixel: float = Form(...),
@@ -78,6 +177,19 @@ def parse_analysis_config(
     )
 
 
+def _to_config_data(config: AnalysisConfigModel) -> AnalysisConfigData:
+    return AnalysisConfigData(
+        scale_um_per_pixel=config.scale_um_per_pixel,
+        line_length_um_horizontal=config.line_length_um_horizontal,
+        line_length_um_vertical=config.line_length_um_vertical,
+        n_lines_horizontal=config.n_lines_horizontal,
+        n_lines_vertical=config.n_lines_vertical,
+        sigma_denoise=config.sigma_denoise,
+        min_area=config.min_area,
+        magnification=config.magnification,
+    )
+
+
 @app.get('/health')
 async def health_check() -> dict[str, str]:
     return {'status': 'ok', 'timestamp': datetime.utcnow().isoformat() + 'Z'}
@@ -100,9 +212,15 @@ async def upload_images(
         target_dir.mkdir(parents=True, exist_ok=True)
         file_identifier = f"{datetime.utcnow().strftime('%Y%m%d%H%M%S%f')}_{upload.filename}"
         destination = target_dir / file_identifier
-        with destination.open('wb') as destination_file:
-            shutil.copyfileobj(upload.file, destination_file)
-        upload.file.close()
+        # Uploads spooled to a temporary file on disk can be copied kernel-side;
+        # small uploads still held in memory have no descriptor to send from.
+        if SENDFILE_SUPPORTED and getattr(upload.file, '_rolled', True):
+            await run_in_threadpool(_sendfile_upload, upload.file, destination)
+        else:
+            async with aiofiles.open(destination, 'wb') as destination_file:
+                while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+                    await destination_file.write(chunk)
+        await upload.close()
         size = destination.stat().st_size
         record = state_manager.add_image(animal_id, upload.filename, destination, size)
         uploads.append(
@@ -119,72 +237,117 @@ async def upload_images(
 
 
 @app.post('/analyze', response_model=AnalysisResultModel)
-async def analyze(request: AnalyzeRequestModel) -> AnalysisResultModel:
+async def analyze(request: AnalyzeRequestModel) -> ORJSONResponse:
     images = state_manager.get_images_for_animal(request.animal_id)
     if not images:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='No images found for this animal')
 
-    config = request.config
-    config_data = AnalysisConfigData(**config.dict())
+    config_data = _to_config_data(request.config)
 
-    image_results: List[AnalysisImageResult] = []
-    for index, image in enumerate(images):
+    image_paths: List[Path] = []
+    for image in images:
         image_path = Path(image.stored_path)
         if not image_path.is_absolute():
             image_path = BASE_DIR / image_path
         if not image_path.exists():
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f'Image not found on disk: {image_path}')
+        image_paths.append(image_path)
 
-        try:
-            metrics = run_mli_analysis(image_path, config_data)
-        except ImageProcessingError as error:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(error)) from error
-
-        image_results.append(
-            AnalysisImageResult(
-                image_id=image.image_id,
-                image_number=index + 1,
-                name=image.original_filename,
-                average_mli_um=metrics.average_mli_um,
-                processed_image_base64=metrics.processed_image_base64,
-                threshold_image_base64=metrics.threshold_image_base64,
-                lines=[
-                    LineResult(
-                        line_number=line.line_number,
-                        horizontal_intercepts=line.horizontal_intercepts,
-                        vertical_intercepts=line.vertical_intercepts,
-                        horizontal_length_um=line.horizontal_length_um,
-                        vertical_length_um=line.vertical_length_um,
-                        total_line_length_um=line.total_line_length_um,
-                        mean_linear_intercept_um=line.mean_linear_intercept_um,
-                    )
-                    for line in metrics.lines
-                ],
+    loop = asyncio.get_running_loop()
+    executor = analysis_executor
+    try:
+        image_metrics = await asyncio.gather(
+            *(loop.run_in_executor(executor, run_mli_analysis, path, config_data) for path in image_paths)
+        )
+    except ImageProcessingError as error:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(error)) from error
+    except BrokenProcessPool as error:
+        _replace_broken_executor(executor)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail='Analysis worker stopped unexpectedly; please retry'
+        ) from error
+
+    # Stored overlays stay pinned until the result referencing them is recorded.
+    stored_overlays: List[str] = []
+    try:
+        image_results: List[AnalysisImageResult] = []
+        for index, (image, metrics) in enumerate(zip(images, image_metrics)):
+            processed_image_path = await run_in_threadpool(state_manager.store_overlay, metrics.processed_image_png)
+            stored_overlays.append(processed_image_path)
+            threshold_image_path = await run_in_threadpool(state_manager.store_overlay, metrics.threshold_image_png)
+            stored_overlays.append(threshold_image_path)
+            image_results.append(
+                AnalysisImageResult(
+                    image_id=image.image_id,
+                    image_number=index + 1,
+                    name=image.original_filename,
+                    average_mli_um=metrics.average_mli_um,
+                    processed_image_path=processed_image_path,
+                    threshold_image_path=threshold_image_path,
+                    lines=[
+                        LineResult(
+                            line_number=line.line_number,
+                            horizontal_intercepts=line.horizontal_intercepts,
+                            vertical_intercepts=line.vertical_intercepts,
+                            horizontal_length_um=line.horizontal_length_um,
+                            vertical_length_um=line.vertical_length_um,
+                            total_line_length_um=line.total_line_length_um,
+                            mean_linear_intercept_um=line.mean_linear_intercept_um,
+                        )
+                        for line in metrics.lines
+                    ],
+                )
             )
+
+        analysis_result = AnalysisResult(
+            animal_id=request.animal_id,
+            generated_at=datetime.utcnow().isoformat() + 'Z',
+            images=image_results,
         )
+        state_manager.record_analysis(analysis_result)
+    finally:
+        state_manager.release_overlays(stored_overlays)
 
-    analysis_result = AnalysisResult(
-        animal_id=request.animal_id,
-        generated_at=datetime.utcnow().isoformat() + 'Z',
-        images=image_results,
-    )
-    state_manager.record_analysis(analysis_result)
+    # Only a recorded run may be served from memory; until then overlay requests fall back to the stored result.
+    for image, metrics in zip(images, image_metrics):
+        _cache_overlay(ANALYSIS_SCOPE, image.image_id, OverlayKind.processed.value, metrics.processed_image_png)
+        _cache_overlay(ANALYSIS_SCOPE, image.image_id, OverlayKind.threshold.value, metrics.threshold_image_png)
 
-    return AnalysisResultModel.model_validate(asdict(analysis_result))
+    return ORJSONResponse(_result_payload(analysis_result))
 
 
 @app.get('/results', response_model=List[AnalysisResultModel])
-async def get_results() -> List[AnalysisResultModel]:
+async def get_results() -> ORJSONResponse:
     results = state_manager.get_results()
-    return [AnalysisResultModel.model_validate(asdict(result)) for result in results]
+    return ORJSONResponse([_result_payload(result) for result in results])
 
 
 @app.post('/results/clear', response_model=ClearResultsResponseModel)
 async def clear_results_endpoint() -> ClearResultsResponseModel:
     state_manager.clear_results()
+    _discard_overlays(ANALYSIS_SCOPE)
     return ClearResultsResponseModel(success=True)
 
 
+@app.get('/images/{image_id}/{kind}.png')
+async def get_analysis_overlay(image_id: str, kind: OverlayKind) -> Response:
+    png = overlay_cache.get(_overlay_key(ANALYSIS_SCOPE, image_id, kind.value))
+    if png is not None:
+        return _png_response(png)
+    overlay_path = state_manager.get_overlay_path(image_id, kind.value)
+    if overlay_path is None or not overlay_path.exists():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Overlay not found')
+    return FileResponse(overlay_path, media_type='image/png')
+
+
+@app.get('/preview/{image_id}/{kind}.png')
+async def get_preview_overlay(image_id: str, kind: OverlayKind) -> Response:
+    png = overlay_cache.get(_overlay_key(PREVIEW_SCOPE, image_id, kind.value))
+    if png is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Preview overlay not found')
+    return _png_response(png)
+
+
 @app.get('/export')
 async def export_results() -> StreamingResponse:
     results = state_manager.get_results()
@@ -220,18 +383,23 @@ async def delete_image(image_id: str) -> DeleteImageResponseModel:
     if not path.is_absolute():
         path = BASE_DIR / path
     path.unlink(missing_ok=True)
+    evict_cached_image(path)
+    _discard_overlays(ANALYSIS_SCOPE, image_id)
+    _discard_overlays(PREVIEW_SCOPE, image_id)
 
     return DeleteImageResponseModel(success=True, image_id=image_id)
 
 
 @app.post('/analyze/preview', response_model=AnalysisImageResultModel)
-async def analyze_preview(request: PreviewAnalysisRequestModel) -> AnalysisImageResultModel:
+async def analyze_preview(request: PreviewAnalysisRequestModel) -> ORJSONResponse:
     images = state_manager.get_images_for_animal(request.animal_id)
     if not images:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='No images found for this animal')
 
-    image_lookup = {image.image_id: (index, image) for index, image in enumerate(images)}
-    lookup_entry = image_lookup.get(request.image_id)
+    lookup_entry = next(
+        ((index, image) for index, image in enumerate(images) if image.image_id == request.image_id),
+        None,
+    )
     if lookup_entry is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Image not found for this animal')
 
@@ -242,30 +410,26 @@ async def analyze_preview(request: PreviewAnalysisRequestModel) -> AnalysisImage
     if not image_path.exists():
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f'Image not found on disk: {image_path}')
 
-    config_data = AnalysisConfigData(**request.config.dict())
+    config_data = _to_config_data(request.config)
 
     try:
-        metrics = run_mli_analysis(image_path, config_data)
+        metrics = run_mli_analysis(image_path, config_data, use_cache=True)
     except ImageProcessingError as error:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(error)) from error
 
-    return AnalysisImageResultModel(
-        image_id=image_record.image_id,
-        image_number=image_index + 1,
-        name=image_record.original_filename,
-        average_mli_um=metrics.average_mli_um,
-        processed_image_base64=metrics.processed_image_base64,
-        threshold_image_base64=metrics.threshold_image_base64,
-        lines=[
-            LineResultModel(
-                line_number=line.line_number,
-                horizontal_intercepts=line.horizontal_intercepts,
-                vertical_intercepts=line.vertical_intercepts,
-                horizontal_length_um=line.horizontal_length_um,
-                vertical_length_um=line.vertical_length_um,
-                total_line_length_um=line.total_line_length_um,
-                mean_linear_intercept_um=line.mean_linear_intercept_um,
-            )
-            for line in metrics.lines
-        ],
+    _cache_overlay(PREVIEW_SCOPE, image_record.image_id, OverlayKind.processed.value, metrics.processed_image_png)
+    _cache_overlay(PREVIEW_SCOPE, image_record.image_id, OverlayKind.threshold.value, metrics.threshold_image_png)
+    version = uuid.uuid4().hex
+    processed_url = _overlay_url(PREVIEW_SCOPE, image_record.image_id, OverlayKind.processed.value, version)
+    threshold_url = _overlay_url(PREVIEW_SCOPE, image_record.image_id, OverlayKind.threshold.value, version)
+    return ORJSONResponse(
+        {
+            'image_id': image_record.image_id,
+            'image_number': image_index + 1,
+            'name': image_record.original_filename,
+            'average_mli_um': metrics.average_mli_um,
+            'processed_image_url': processed_url,
+            'threshold_image_url': threshold_url,
+            'lines': [asdict(line) for line in metrics.lines],
+        }
     )
@@ -1,14 +1,11 @@
 from __future__ import annotations
 
-import base64
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
 import cv2
 import numpy as np
-from skimage import filters, morphology
-from skimage.draw import line as draw_line
 
 
 @dataclass
@@ -38,60 +35,109 @@ class LineMetrics:
 class MLIImageMetrics:
     lines: List[LineMetrics]
     average_mli_um: float | None
-    processed_image_base64: str
-    threshold_image_base64: str
+    processed_image_png: bytes
+    threshold_image_png: bytes
 
 
 class ImageProcessingError(Exception):
     """Raised when an image cannot be processed."""
 
 
-def _load_image_and_mask(path: Path, config: AnalysisConfigData) -> Tuple[np.ndarray, np.ndarray]:
-    image = cv2.imread(str(path), cv2.IMREAD_COLOR)
+IMAGE_CACHE_LIMIT = 8
+# Only the in-process preview path uses this cache; pool workers analyse each image once and load it directly.
+_image_cache: Dict[Tuple[str, int, float, int], Tuple[np.ndarray, np.ndarray]] = {}
+
+
+def _read_image_and_mask(path: str, sigma_denoise: float, min_area: int) -> Tuple[np.ndarray, np.ndarray]:
+    image = cv2.imread(path, cv2.IMREAD_COLOR)
     if image is None:
         raise ImageProcessingError(f'Unable to read image at {path}')
 
     gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
 
-    if config.sigma_denoise > 0:
-        gray = cv2.GaussianBlur(gray, (0, 0), config.sigma_denoise)
+    if sigma_denoise > 0:
+        gray = cv2.GaussianBlur(gray, (0, 0), sigma_denoise)
+
+    threshold, _ = cv2.threshold(gray, 0, 1, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    _, tissue_mask = cv2.threshold(gray, threshold - 1, 1, cv2.THRESH_BINARY_INV)
+
+    if min_area > 0:
+        _, labels, stats, _ = cv2.connectedComponentsWithStats(tissue_mask, connectivity=4)
+        keep = stats[:, cv2.CC_STAT_AREA] >= min_area
+        keep[0] = False
+        tissue_mask = keep[labels].astype(np.uint8)
+
+    # Cached arrays are shared between calls, so callers must copy before drawing.
+    image.setflags(write=False)
+    tissue_mask.setflags(write=False)
+    return image, tissue_mask
+
+
+def _load_image_and_mask(
+    path: Path, config: AnalysisConfigData, use_cache: bool = False
+) -> Tuple[np.ndarray, np.ndarray]:
+    if not use_cache:
+        return _read_image_and_mask(str(path), config.sigma_denoise, config.min_area)
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except OSError as error:
+        raise ImageProcessingError(f'Unable to read image at {path}') from error
+    key = (str(path), mtime_ns, config.sigma_denoise, config.min_area)
+    cached = _image_cache.pop(key, None)
+    if cached is None:
+        cached = _read_image_and_mask(key[0], config.sigma_denoise, config.min_area)
+    _image_cache[key] = cached
+    while len(_image_cache) > IMAGE_CACHE_LIMIT:
+        _image_cache.pop(next(iter(_image_cache)))
+    return cached
+
+
+def evict_cached_image(path: Path) -> None:
+    target = str(path)
+    for key in [key for key in _image_cache if key[0] == target]:
+        del _image_cache[key]
+
+
+def _auto_positions(length: int, count: int) -> np.ndarray:
+    if count <= 0:
+        return np.empty(0, dtype=np.intp)
+    step = length / (count + 1)
+    return np.rint(step * np.arange(1, count + 1)).astype(np.intp)
 
-    threshold = filters.threshold_otsu(gray)
-    tissue_mask = gray < threshold
 
-    if config.min_area > 0:
-        tissue_mask = morphology.remove_small_objects(tissue_mask, min_size=config.min_area)
+def _scan_intercepts(samples: np.ndarray) -> Tuple[np.ndarray, List[np.ndarray]]:
+    """Count intercepts along each row of a (lines, length) uint8 matrix whose values are strictly 0 or 1."""
+    line_count, length = samples.shape
+    if line_count == 0:
+        return np.zeros(0, dtype=np.intp), []
+    transitions = samples[:, 1:] ^ samples[:, :-1]
+    line_indices, change_indices = np.nonzero(transitions)
+    change_indices += 1
 
-    return image, tissue_mask.astype(np.uint8)
+    change_counts = np.count_nonzero(transitions, axis=1)
+    usable_counts = change_counts - (change_counts % 2)
+    line_offsets = np.repeat(np.cumsum(change_counts) - change_counts, change_counts)
+    usable = (np.arange(change_indices.size) - line_offsets) < usable_counts[line_indices]
+    change_indices = change_indices[usable]
 
+    midpoints = np.round((change_indices[0::2] + change_indices[1::2]) / 2).astype(np.int32)
+    midpoints = np.clip(midpoints, 0, length - 1)
+    intercept_counts = usable_counts // 2
+    return intercept_counts, np.split(midpoints, np.cumsum(intercept_counts)[:-1])
 
-def _auto_positions(length: int, count: int) -> List[int]:
-    if count <= 0:
-        return []
-    step = length / (count + 1)
-    return [int(round(step * (index + 1))) for index in range(count)]
-
-
-def _count_intercepts(samples: np.ndarray) -> Tuple[int, np.ndarray]:
-    if samples.size == 0:
-        return 0, np.array([], dtype=np.int32)
-    active = samples > 0
-    transitions = np.diff(active.astype(np.int8))
-    change_indices = np.where(transitions != 0)[0] + 1
-    usable_length = change_indices.size - (change_indices.size % 2)
-    if usable_length <= 0:
-        return 0, np.array([], dtype=np.int32)
-    paired = change_indices[:usable_length].reshape(-1, 2)
-    midpoints = np.round(paired.mean(axis=1)).astype(np.int32)
-    midpoints = np.clip(midpoints, 0, samples.size - 1)
-    return int(midpoints.size), midpoints
-
-
-def _encode_image_to_base64(image: np.ndarray) -> str:
-    success, buffer = cv2.imencode('.png', image)
+
+PNG_ENCODE_PARAMS = [cv2.IMWRITE_PNG_COMPRESSION, 1]
+PREVIEW_SCALE = 0.5
+PREVIEW_DOWNSCALE_MIN_DIMENSION = 1024
+
+
+def _encode_image_to_png(image: np.ndarray) -> bytes:
+    if max(image.shape[:2]) > PREVIEW_DOWNSCALE_MIN_DIMENSION:
+        image = cv2.resize(image, None, fx=PREVIEW_SCALE, fy=PREVIEW_SCALE, interpolation=cv2.INTER_AREA)
+    success, buffer = cv2.imencode('.png', image, PNG_ENCODE_PARAMS)
     if not success:
         raise ImageProcessingError('Unable to encode processed image to PNG')
-    return base64.b64encode(buffer).decode('ascii')
+    return buffer.tobytes()
 
 
 def _draw_intercept_marker(canvas: np.ndarray, point: Tuple[int, int]) -> None:
@@ -108,8 +154,41 @@ def _draw_intercept_marker(canvas: np.ndarray, point: Tuple[int, int]) -> None:
     cv2.circle(canvas, point, 4, (255, 0, 255), -1, lineType=cv2.LINE_AA)
 
 
-def run_mli_analysis(path: Path, config: AnalysisConfigData) -> MLIImageMetrics:
-    image, mask = _load_image_and_mask(path, config)
+MARKER_RADIUS = 20
+
+
+def _build_marker_stencil() -> Tuple[np.ndarray, np.ndarray]:
+    # Anti-aliased drawing is affine in the background colour, so rendering the
+    # marker once on black and once on white recovers its colour and coverage.
+    size = 2 * MARKER_RADIUS + 1
+    center = (MARKER_RADIUS, MARKER_RADIUS)
+    on_black = np.zeros((size, size, 3), dtype=np.uint8)
+    on_white = np.full((size, size, 3), 255, dtype=np.uint8)
+    _draw_intercept_marker(on_black, center)
+    _draw_intercept_marker(on_white, center)
+    premultiplied = on_black.astype(np.float32)
+    transmittance = (on_white.astype(np.float32) - premultiplied) / 255
+    return premultiplied, transmittance
+
+
+MARKER_PREMULTIPLIED, MARKER_TRANSMITTANCE = _build_marker_stencil()
+
+
+def _stamp_markers(canvas: np.ndarray, points: np.ndarray) -> None:
+    height, width = canvas.shape[:2]
+    for x, y in points.tolist():
+        top, left = max(y - MARKER_RADIUS, 0), max(x - MARKER_RADIUS, 0)
+        bottom, right = min(y + MARKER_RADIUS + 1, height), min(x + MARKER_RADIUS + 1, width)
+        stencil_rows = slice(top - y + MARKER_RADIUS, bottom - y + MARKER_RADIUS)
+        stencil_cols = slice(left - x + MARKER_RADIUS, right - x + MARKER_RADIUS)
+        region = canvas[top:bottom, left:right]
+        region[...] = np.rint(
+            MARKER_PREMULTIPLIED[stencil_rows, stencil_cols] + MARKER_TRANSMITTANCE[stencil_rows, stencil_cols] * region
+        )
+
+
+def run_mli_analysis(path: Path, config: AnalysisConfigData, use_cache: bool = False) -> MLIImageMetrics:
+    image, mask = _load_image_and_mask(path, config, use_cache)
     height, width = mask.shape
 
     horizontal_positions = _auto_positions(height, config.n_lines_horizontal)
@@ -119,34 +198,33 @@ def run_mli_analysis(path: Path, config: AnalysisConfigData) -> MLIImageMetrics:
     mask_visual = (mask * 255).astype(np.uint8)
     threshold_overlay = cv2.cvtColor(mask_visual, cv2.COLOR_GRAY2BGR)
 
+    horizontal_counts, horizontal_midpoints = _scan_intercepts(mask[horizontal_positions])
+    vertical_counts, vertical_midpoints = _scan_intercepts(mask[:, vertical_positions].T)
+
     horizontal_data: List[dict] = []
-    for y in horizontal_positions:
+    horizontal_scans = zip(horizontal_positions.tolist(), horizontal_counts.tolist(), horizontal_midpoints)
+    for y, intercepts, intercept_indices in horizontal_scans:
         start_x = 0
         end_x = width - 1
-        rr, cc = draw_line(y, start_x, y, end_x)
-        intercepts, intercept_indices = _count_intercepts(mask[rr, cc])
         length_um = config.line_length_um_horizontal
-        points = [(int(cc[i]), int(rr[i])) for i in intercept_indices]
+        points = np.column_stack((intercept_indices, np.full_like(intercept_indices, y)))
         cv2.line(original_overlay, (start_x, y), (end_x, y), (0, 176, 255), 3, cv2.LINE_AA)
         cv2.line(threshold_overlay, (start_x, y), (end_x, y), (0, 176, 255), 3, cv2.LINE_AA)
-        for point in points:
-            _draw_intercept_marker(original_overlay, point)
-            _draw_intercept_marker(threshold_overlay, point)
+        _stamp_markers(original_overlay, points)
+        _stamp_markers(threshold_overlay, points)
         horizontal_data.append({'intercepts': intercepts, 'length_um': length_um})
 
     vertical_data: List[dict] = []
-    for x in vertical_positions:
+    vertical_scans = zip(vertical_positions.tolist(), vertical_counts.tolist(), vertical_midpoints)
+    for x, intercepts, intercept_indices in vertical_scans:
         start_y = 0
         end_y = height - 1
-        rr, cc = draw_line(start_y, x, end_y, x)
-        intercepts, intercept_indices = _count_intercepts(mask[rr, cc])
         length_um = config.line_length_um_vertical
-        points = [(int(cc[i]), int(rr[i])) for i in intercept_indices]
+        points = np.column_stack((np.full_like(intercept_indices, x), intercept_indices))
         cv2.line(original_overlay, (x, start_y), (x, end_y), (76, 255, 0), 3, cv2.LINE_AA)
         cv2.line(threshold_overlay, (x, start_y), (x, end_y), (76, 255, 0), 3, cv2.LINE_AA)
-        for point in points:
-            _draw_intercept_marker(original_overlay, point)
-            _draw_intercept_marker(threshold_overlay, point)
+        _stamp_markers(original_overlay, points)
+        _stamp_markers(threshold_overlay, points)
         vertical_data.append({'intercepts': intercepts, 'length_um': length_um})
 
     lines: List[LineMetrics] = []
@@ -179,12 +257,12 @@ def run_mli_analysis(path: Path, config: AnalysisConfigData) -> MLIImageMetrics:
     valid_mli = [line.mean_linear_intercept_um for line in lines if line.mean_linear_intercept_um is not None]
     average_mli = float(np.mean(valid_mli)) if valid_mli else None
 
-    processed_image_base64 = _encode_image_to_base64(original_overlay)
-    threshold_image_base64 = _encode_image_to_base64(threshold_overlay)
+    processed_image_png = _encode_image_to_png(original_overlay)
+    threshold_image_png = _encode_image_to_png(threshold_overlay)
 
     return MLIImageMetrics(
         lines=lines,
         average_mli_um=average_mli,
-        processed_image_base64=processed_image_base64,
-        threshold_image_base64=threshold_image_base64,
+        processed_image_png=processed_image_png,
+        threshold_image_png=threshold_image_png,
     )
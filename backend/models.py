@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from enum import Enum
 from typing import List, Optional
 
 from pydantic import BaseModel, Field, validator
@@ -59,11 +60,16 @@ class AnalysisImageResultModel(BaseModel):
     image_number: int
     name: str
     average_mli_um: Optional[float]
-    processed_image_base64: str
-    threshold_image_base64: str
+    processed_image_url: str
+    threshold_image_url: str
     lines: List[LineResultModel]
 
 
+class OverlayKind(str, Enum):
+    processed = 'processed'
+    threshold = 'threshold'
+
+
 class AnalysisResultModel(BaseModel):
     animal_id: str
     generated_at: str
@@ -1,15 +1,41 @@
 from __future__ import annotations
 
+import atexit
+import base64
+import bisect
+import hashlib
 import json
+import logging
+import os
+import sys
 import threading
-import uuid
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
 from dataclasses import asdict, dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson ships with the backend requirements
+    orjson = None
 
-@dataclass
+
+def _dumps(value: object) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False).encode('utf-8')
+
+
+def _loads(data: bytes) -> object:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@dataclass(slots=True)
 class ImageRecord:
     image_id: str
     animal_id: str
@@ -19,13 +45,13 @@ class ImageRecord:
     uploaded_at: str
 
 
-@dataclass
+@dataclass(slots=True)
 class AnimalRecord:
     animal_id: str
     created_at: str
 
 
-@dataclass
+@dataclass(slots=True)
 class LineResult:
     line_number: int
     horizontal_intercepts: int
@@ -36,188 +62,541 @@ class LineResult:
     mean_linear_intercept_um: float | None
 
 
-@dataclass
+@dataclass(slots=True)
 class AnalysisImageResult:
     image_id: str
     image_number: int
     name: str
     average_mli_um: float | None
-    processed_image_base64: str
-    threshold_image_base64: str
+    processed_image_path: str
+    threshold_image_path: str
     lines: List[LineResult] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class AnalysisResult:
     animal_id: str
     generated_at: str
     images: List[AnalysisImageResult]
 
 
+JOURNAL_SNAPSHOT_BYTES = 8 << 20
+JOURNAL_BUFFER_SIZE = 1 << 16
+FLUSH_INTERVAL_SECONDS = 0.05
+TIMESTAMP_REUSE_SECONDS = 0.01
+FLUSH_RETRY_SECONDS = 1.0
+
+logger = logging.getLogger(__name__)
+
+
+def _as_float(value: object) -> float:
+    return value if type(value) is float else float(value)  # type: ignore[arg-type,return-value]
+
+
+def _as_int(value: object) -> int:
+    return value if type(value) is int else int(value)  # type: ignore[call-overload,return-value]
+
+
+def _blob_paths(record: Dict[str, object]) -> Set[str]:
+    paths = set()
+    for image in record.get('images', []):  # type: ignore[attr-defined]
+        paths.add(image.get('processed_image_path'))
+        paths.add(image.get('threshold_image_path'))
+    paths.discard(None)
+    paths.discard('')
+    return paths
+
+
+class ReadWriteLock:
+    """Admits any number of concurrent readers; writers wait for exclusive access and block new readers."""
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        with self._condition:
+            while self._writing or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        with self._condition:
+            self._writers_waiting += 1
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._writers_waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+
+class AnimalImageColumns:
+    """Parallel upload-time and image-id columns for one animal, kept in upload order."""
+
+    __slots__ = ('uploaded_at', 'image_ids')
+
+    def __init__(self) -> None:
+        self.uploaded_at: List[str] = []
+        self.image_ids: List[str] = []
+
+    def add(self, image_id: str, uploaded_at: str) -> None:
+        position = bisect.bisect_right(self.uploaded_at, uploaded_at)
+        self.uploaded_at.insert(position, uploaded_at)
+        self.image_ids.insert(position, image_id)
+
+    def remove(self, image_id: str, uploaded_at: str) -> None:
+        position = bisect.bisect_left(self.uploaded_at, uploaded_at)
+        position = self.image_ids.index(image_id, position)
+        del self.uploaded_at[position]
+        del self.image_ids[position]
+
+
 class StateManager:
     def __init__(self, base_dir: Path) -> None:
         self.base_dir = base_dir
         self.state_path = self.base_dir / 'state.json'
-        self.lock = threading.Lock()
+        self.journal_path = self.base_dir / 'state.log'
+        self.blobs_dir = self.base_dir / 'blobs'
+        self.blobs_dir.mkdir(parents=True, exist_ok=True)
+        self.lock = ReadWriteLock()
+        # Serialises snapshots; always taken before the state lock.
+        self._snapshot_lock = threading.Lock()
         self._state = self._load()
+        self._journal = self.journal_path.open('ab', buffering=JOURNAL_BUFFER_SIZE)
+        # End of the last complete journal write; a failed write is truncated back to here before retrying.
+        self._journal_offset = self._journal.tell()
+        if self._move_inline_overlays_to_blobs():
+            self._snapshot()
+        # Blobs referenced by recorded results, and blobs stored by analyses that have not been recorded yet.
+        self._blob_refs: Counter[str] = Counter()
+        # image_id -> animal_id -> (processed path, threshold path); the last entry is the latest analysis.
+        self._overlay_paths: Dict[str, Dict[str, Tuple[str, Optional[str]]]] = defaultdict(dict)
+        for record in self._state['results'].values():
+            self._blob_refs.update(_blob_paths(record))  # type: ignore[arg-type]
+            self._index_overlays(record)  # type: ignore[arg-type]
+        self._blob_pins: Counter[str] = Counter()
+        self._blob_lock = threading.Lock()
+        # Image ids per animal sorted by upload time; ties keep insertion order.
+        self._by_animal: Dict[str, AnimalImageColumns] = defaultdict(AnimalImageColumns)
+        # Records handed to callers are shared and never mutated; mutators swap in new instances.
+        self._image_objs: Dict[str, ImageRecord] = {}
+        # Every image record repeats its animal id, so share one string object per animal.
+        for image_id, record in self._state['images'].items():
+            animal_id = record['animal_id'] = sys.intern(record['animal_id'])  # type: ignore[index,call-overload]
+            self._by_animal[animal_id].add(image_id, record['uploaded_at'])  # type: ignore[arg-type]
+            self._image_objs[image_id] = ImageRecord(**record)  # type: ignore[arg-type]
+        # Readers may fill this cache concurrently; they store identical trees, and eviction only happens under write().
+        self._result_cache: Dict[Tuple[str, object], AnalysisResult] = {}
+        self._timestamp_cache = (0.0, '')
+
+        self._pending: List[bytes] = []
+        self._dirty = threading.Event()
+        self._closed = False
+        self._flusher = threading.Thread(target=self._flush_loop, name='state-flusher', daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
 
     def _load(self) -> Dict[str, Dict[str, object]]:
-        if not self.state_path.exists():
-            return {'animals': {}, 'images': {}, 'results': {}}
-        with self.state_path.open('r', encoding='utf-8') as handle:
-            return json.load(handle)
+        state: Dict[str, Dict[str, object]] = {'animals': {}, 'images': {}, 'results': {}}
+        if self.state_path.exists():
+            state = _loads(self.state_path.read_bytes())  # type: ignore[assignment]
+        if self.journal_path.exists():
+            replayed_bytes = 0
+            with self.journal_path.open('rb', buffering=JOURNAL_BUFFER_SIZE) as handle:
+                for line in handle:
+                    # A torn final line means the process died mid-append; nothing after it was written. An entry
+                    # cut just before its newline still parses, but the next append would run onto the same line.
+                    if not line.endswith(b'\n'):
+                        break
+                    try:
+                        entry = _loads(line)
+                    except ValueError:
+                        break
+                    self._apply(state, entry)
+                    replayed_bytes += len(line)
+            os.truncate(self.journal_path, replayed_bytes)
+        return state
+
+    @staticmethod
+    def _apply(state: Dict[str, Dict[str, object]], entry: Dict[str, object]) -> None:
+        section = state[entry['section']]  # type: ignore[index]
+        if entry['op'] == 'set':
+            section[entry['key']] = entry['value']  # type: ignore[index]
+        elif entry['op'] == 'delete':
+            section.pop(entry['key'], None)  # type: ignore[arg-type]
+        elif entry['op'] == 'clear':
+            section.clear()
+
+    def _now_iso(self) -> str:
+        # Records created within the same few milliseconds share one formatted timestamp.
+        now = time.time()
+        cached_at, cached_iso = self._timestamp_cache
+        if 0 <= now - cached_at < TIMESTAMP_REUSE_SECONDS:
+            return cached_iso
+        iso = datetime.utcfromtimestamp(now).isoformat()
+        self._timestamp_cache = (now, iso)
+        return iso
+
+    def _append(self, op: str, section: str, key: Optional[str] = None, value: object = None) -> None:
+        # Callers hold the write lock. Entries are encoded now so later in-place edits cannot leak into them.
+        entry = {'op': op, 'section': section, 'key': key, 'value': value}
+        self._pending.append(_dumps(entry) + b'\n')
+        self._dirty.set()
+
+    def _write_pending(self) -> None:
+        # Pending entries are only dropped once they are on disk, so a failed write is retried in full.
+        self._dirty.clear()
+        if not self._pending:
+            return
+        if self._journal.closed:
+            os.truncate(self.journal_path, self._journal_offset)
+            self._journal = self.journal_path.open('ab', buffering=JOURNAL_BUFFER_SIZE)
+        try:
+            self._journal.write(b''.join(self._pending))
+            self._journal.flush()
+        except OSError:
+            # The buffer may hold a torn entry; drop the handle so the retry starts from the last complete write.
+            try:
+                self._journal.close()
+            except OSError:
+                pass
+            raise
+        self._pending.clear()
+        self._journal_offset = self._journal.tell()
 
-    def _save(self) -> None:
-        with self.state_path.open('w', encoding='utf-8') as handle:
-            json.dump(self._state, handle, ensure_ascii=False, indent=2)
+    def _flush_loop(self) -> None:
+        while True:
+            self._dirty.wait()
+            time.sleep(FLUSH_INTERVAL_SECONDS)
+            try:
+                if not self._flush_once():
+                    return
+            except Exception:
+                logger.exception('Persisting state failed; retrying in %.1f s', FLUSH_RETRY_SECONDS)
+                self._dirty.set()
+                time.sleep(FLUSH_RETRY_SECONDS)
+
+    def _flush_once(self) -> bool:
+        with self._snapshot_lock:
+            with self.lock.write():
+                if self._closed:
+                    return False
+                self._write_pending()
+                covered_bytes = self._journal_offset
+                if covered_bytes < JOURNAL_SNAPSHOT_BYTES:
+                    return True
+                payload = _dumps(self._state)
+            # Mutators keep appending while the snapshot is written. Journal entries it already covers are
+            # full-value sets, deletes and clears, so replaying them over the snapshot after a crash is harmless.
+            self._write_state(payload)
+            with self.lock.write():
+                self._write_pending()
+                with self.journal_path.open('rb') as handle:
+                    handle.seek(covered_bytes)
+                    self._replace_journal(handle.read(self._journal_offset - covered_bytes))
+        return True
+
+    def flush(self) -> None:
+        with self.lock.write():
+            if not self._closed:
+                self._write_pending()
+
+    def _write_state(self, payload: bytes) -> None:
+        temp_path = self.state_path.with_suffix('.tmp')
+        descriptor = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            view = memoryview(payload)
+            while view:
+                view = view[os.write(descriptor, view):]
+        finally:
+            os.close(descriptor)
+        os.replace(temp_path, self.state_path)
+
+    def _replace_journal(self, entries: bytes) -> None:
+        temp_path = self.journal_path.with_suffix('.log.tmp')
+        temp_path.write_bytes(entries)
+        self._journal.close()
+        os.replace(temp_path, self.journal_path)
+        self._journal_offset = len(entries)
+        self._journal = self.journal_path.open('ab', buffering=JOURNAL_BUFFER_SIZE)
+
+    def _snapshot(self) -> None:
+        self._write_state(_dumps(self._state))
+        self._replace_journal(b'')
+
+    def close(self) -> None:
+        with self._snapshot_lock, self.lock.write():
+            if self._closed:
+                return
+            self._snapshot()
+            self._closed = True
+            self._pending.clear()
+            self._journal.close()
+        self._dirty.set()
 
     def ensure_animal(self, animal_id: str) -> AnimalRecord:
-        with self.lock:
+        with self.lock.write():
             animals: Dict[str, Dict[str, str]] = self._state['animals']  # type: ignore[assignment]
             if animal_id not in animals:
-                record = AnimalRecord(animal_id=animal_id, created_at=datetime.utcnow().isoformat())
-                animals[animal_id] = asdict(record)
-                self._save()
+                animals[animal_id] = {'animal_id': animal_id, 'created_at': self._now_iso()}
+                self._append('set', 'animals', animal_id, animals[animal_id])
             return AnimalRecord(**animals[animal_id])
 
     def add_image(self, animal_id: str, filename: str, stored_path: Path, size: int) -> ImageRecord:
-        with self.lock:
+        animal_id = sys.intern(animal_id)
+        with self.lock.write():
             images: Dict[str, Dict[str, object]] = self._state['images']  # type: ignore[assignment]
-            image_id = uuid.uuid4().hex
-            record = ImageRecord(
-                image_id=image_id,
-                animal_id=animal_id,
-                original_filename=filename,
-                stored_path=str(stored_path),
-                size=size,
-                uploaded_at=datetime.utcnow().isoformat(),
-            )
-            images[image_id] = asdict(record)
-            self._save()
+            image_id = os.urandom(16).hex()
+            record_dict: Dict[str, object] = {
+                'image_id': image_id,
+                'animal_id': animal_id,
+                'original_filename': filename,
+                'stored_path': str(stored_path),
+                'size': size,
+                'uploaded_at': self._now_iso(),
+            }
+            images[image_id] = record_dict
+            self._by_animal[animal_id].add(image_id, record_dict['uploaded_at'])  # type: ignore[arg-type]
+            record = self._image_objs[image_id] = ImageRecord(**record_dict)  # type: ignore[arg-type]
+            self._append('set', 'images', image_id, record_dict)
             return record
 
     def remove_image(self, image_id: str) -> Optional[ImageRecord]:
-        with self.lock:
+        with self.lock.write():
             images: Dict[str, Dict[str, object]] = self._state['images']  # type: ignore[assignment]
             record_dict = images.pop(image_id, None)
             if record_dict is None:
                 return None
-            self._save()
-            return ImageRecord(**record_dict)  # type: ignore[arg-type]
+            columns = self._by_animal[record_dict['animal_id']]  # type: ignore[index]
+            columns.remove(image_id, record_dict['uploaded_at'])  # type: ignore[arg-type]
+            self._append('delete', 'images', image_id)
+            return self._image_objs.pop(image_id)
 
     def move_image(self, image_id: str, to_animal_id: str) -> Optional[ImageRecord]:
-        with self.lock:
+        to_animal_id = sys.intern(to_animal_id)
+        with self.lock.write():
             images: Dict[str, Dict[str, object]] = self._state['images']  # type: ignore[assignment]
             record_dict = images.get(image_id)
             if record_dict is None:
                 return None
+            if record_dict['animal_id'] == to_animal_id:
+                return self._image_objs[image_id]
+            columns = self._by_animal[record_dict['animal_id']]  # type: ignore[index]
+            columns.remove(image_id, record_dict['uploaded_at'])  # type: ignore[arg-type]
             record_dict['animal_id'] = to_animal_id
-            record_dict['uploaded_at'] = record_dict.get('uploaded_at') or datetime.utcnow().isoformat()
+            if not record_dict.get('uploaded_at'):
+                record_dict['uploaded_at'] = self._now_iso()
+            self._by_animal[to_animal_id].add(image_id, record_dict['uploaded_at'])  # type: ignore[arg-type]
             images[image_id] = record_dict
-            self._save()
-            return ImageRecord(**record_dict)  # type: ignore[arg-type]
+            record = self._image_objs[image_id] = ImageRecord(**record_dict)  # type: ignore[arg-type]
+            self._append('set', 'images', image_id, record_dict)
+            return record
 
     def get_images_for_animal(self, animal_id: str) -> List[ImageRecord]:
-        with self.lock:
-            images: Dict[str, Dict[str, object]] = self._state['images']  # type: ignore[assignment]
-            relevant = [ImageRecord(**record) for record in images.values() if record['animal_id'] == animal_id]
-            relevant.sort(key=lambda record: record.uploaded_at)
-            return relevant
+        with self.lock.read():
+            columns = self._by_animal.get(animal_id)
+            if columns is None:
+                return []
+            image_objs = self._image_objs
+            return [image_objs[image_id] for image_id in columns.image_ids]
 
     def record_analysis(self, result: AnalysisResult) -> None:
-        with self.lock:
+        with self.lock.write():
             results: Dict[str, Dict[str, object]] = self._state['results']  # type: ignore[assignment]
+            previous = results.get(result.animal_id)
+            if previous is not None:
+                self._result_cache.pop((result.animal_id, previous.get('generated_at')), None)
+            images = [asdict(image) for image in result.images]
+            for image in images:
+                # Readers fall back to the processed overlay, so an identical threshold overlay is not stored twice.
+                if image['threshold_image_path'] == image['processed_image_path']:
+                    image['threshold_image_path'] = None
             results[result.animal_id] = {
                 'animal_id': result.animal_id,
                 'generated_at': result.generated_at,
-                'images': [asdict(image) for image in result.images],
+                'images': images,
             }
-            self._save()
+            self._append('set', 'results', result.animal_id, results[result.animal_id])
+            self._blob_refs.update(_blob_paths(results[result.animal_id]))
+            if previous is not None:
+                self._unindex_overlays(previous)
+            self._index_overlays(results[result.animal_id])
+            if previous is not None:
+                released = _blob_paths(previous)
+                self._blob_refs.subtract(released)
+                self._discard_unreferenced_blobs(released)
+
+    def store_overlay(self, png: bytes) -> str:
+        """Write an overlay blob and pin it until the caller passes the path to release_overlays."""
+        relative_path = self._blob_relative_path(png)
+        with self._blob_lock:
+            self._blob_pins[relative_path] += 1
+        try:
+            self._write_blob(relative_path, png)
+        except BaseException:
+            self.release_overlays([relative_path])
+            raise
+        return relative_path
+
+    def release_overlays(self, relative_paths: Iterable[str]) -> None:
+        relative_paths = list(relative_paths)
+        with self.lock.write():
+            with self._blob_lock:
+                for relative_path in relative_paths:
+                    self._blob_pins[relative_path] -= 1
+            self._discard_unreferenced_blobs(relative_paths)
+
+    @staticmethod
+    def _blob_relative_path(png: bytes) -> str:
+        # Blobs are content addressed, so identical overlays share one file and rewriting one is skipped.
+        return f'blobs/{hashlib.sha256(png).hexdigest()}.png'
+
+    def _write_blob(self, relative_path: str, png: bytes) -> None:
+        path = self.base_dir / relative_path
+        if not path.exists():
+            temp_path = path.with_name(f'{path.name}.{os.urandom(4).hex()}.tmp')
+            temp_path.write_bytes(png)
+            os.replace(temp_path, path)
+
+    def _discard_unreferenced_blobs(self, candidates: Iterable[str]) -> None:
+        # Callers hold the write lock. Pins are checked under the blob lock so a concurrent store_overlay either
+        # pins the blob first or finds it gone and writes it again.
+        with self._blob_lock:
+            for relative_path in candidates:
+                if self._blob_refs[relative_path] > 0 or self._blob_pins[relative_path] > 0:
+                    continue
+                self._blob_refs.pop(relative_path, None)
+                self._blob_pins.pop(relative_path, None)
+                (self.base_dir / relative_path).unlink(missing_ok=True)
+
+    def _move_inline_overlays_to_blobs(self) -> bool:
+        # State written before overlays moved out of line embeds them as base64; convert those records once on load.
+        moved = False
+        results: Dict[str, Dict[str, object]] = self._state['results']  # type: ignore[assignment]
+        for record in results.values():
+            for image in record.get('images', []):  # type: ignore[union-attr]
+                for kind in ('processed', 'threshold'):
+                    encoded = image.pop(f'{kind}_image_base64', None)
+                    if encoded:
+                        png = base64.b64decode(encoded)
+                        image[f'{kind}_image_path'] = relative_path = self._blob_relative_path(png)
+                        self._write_blob(relative_path, png)
+                        moved = True
+        return moved
+
+    def _index_overlays(self, record: Dict[str, object]) -> None:
+        for image in record.get('images', []):  # type: ignore[attr-defined]
+            self._overlay_paths[image.get('image_id')][record['animal_id']] = (  # type: ignore[index]
+                image.get('processed_image_path'),
+                image.get('threshold_image_path'),
+            )
+
+    def _unindex_overlays(self, record: Dict[str, object]) -> None:
+        for image in record.get('images', []):  # type: ignore[attr-defined]
+            by_animal = self._overlay_paths.get(image.get('image_id'))
+            if by_animal is None:
+                continue
+            by_animal.pop(record['animal_id'], None)  # type: ignore[arg-type]
+            if not by_animal:
+                del self._overlay_paths[image.get('image_id')]
+
+    def get_overlay_path(self, image_id: str, kind: str) -> Optional[Path]:
+        with self.lock.read():
+            by_animal = self._overlay_paths.get(image_id)
+            if not by_animal:
+                return None
+            processed_path, threshold_path = next(reversed(by_animal.values()))
+            relative_path = (threshold_path if kind == 'threshold' else None) or processed_path
+            return self.base_dir / relative_path if relative_path else None
 
     def _coerce_line(self, data: Dict[str, object], default_number: int = 0) -> LineResult:
-        horizontal_length = float(data.get('horizontal_length_um', 0.0) or 0.0)
-        vertical_length = float(data.get('vertical_length_um', 0.0) or 0.0)
-        total_length = data.get('total_line_length_um')
-        total_length_um = float(total_length) if total_length is not None else horizontal_length + vertical_length
+        get = data.get
+        horizontal_length = _as_float(get('horizontal_length_um') or 0.0)
+        vertical_length = _as_float(get('vertical_length_um') or 0.0)
+        total_length = get('total_line_length_um')
+        mean_linear_intercept = get('mean_linear_intercept_um')
         return LineResult(
-            line_number=int(data.get('line_number', default_number)),
-            horizontal_intercepts=int(data.get('horizontal_intercepts', 0)),
-            vertical_intercepts=int(data.get('vertical_intercepts', 0)),
+            line_number=_as_int(get('line_number', default_number)),
+            horizontal_intercepts=_as_int(get('horizontal_intercepts', 0)),
+            vertical_intercepts=_as_int(get('vertical_intercepts', 0)),
             horizontal_length_um=horizontal_length,
             vertical_length_um=vertical_length,
-            total_line_length_um=total_length_um,
-            mean_linear_intercept_um=(
-                float(data['mean_linear_intercept_um'])
-                if data.get('mean_linear_intercept_um') is not None
-                else None
+            total_line_length_um=(
+                _as_float(total_length) if total_length is not None else horizontal_length + vertical_length
             ),
+            mean_linear_intercept_um=_as_float(mean_linear_intercept) if mean_linear_intercept is not None else None,
         )
 
     def clear_results(self) -> None:
-        with self.lock:
+        with self.lock.write():
             self._state['results'] = {}
-            self._save()
+            self._result_cache.clear()
+            self._append('clear', 'results')
+            self._overlay_paths.clear()
+            # Only blobs the cleared results referenced go; in-flight temp files and pinned blobs are left alone.
+            released = list(self._blob_refs)
+            self._blob_refs.clear()
+            self._discard_unreferenced_blobs(released)
 
-    def get_results(self) -> List[AnalysisResult]:
-        with self.lock:
-            results: Dict[str, Dict[str, object]] = self._state['results']  # type: ignore[assignment]
-            return [
-                AnalysisResult(
-                    animal_id=record['animal_id'],
-                    generated_at=record.get('generated_at', datetime.utcnow().isoformat()),
-                    images=[
-                        AnalysisImageResult(
-                            image_id=image.get('image_id', ''),
-                            image_number=int(image.get('image_number', index + 1)),
-                            name=image.get('name', ''),
-                            average_mli_um=(
-                                float(image['average_mli_um'])
-                                if image.get('average_mli_um') is not None
-                                else None
-                            ),
-                            processed_image_base64=image.get('processed_image_base64', ''),
-                            threshold_image_base64=(
-                                image.get('threshold_image_base64')
-                                or image.get('processed_image_base64', '')
-                            ),
-                            lines=[
-                                self._coerce_line(line, line_index + 1)
-                                for line_index, line in enumerate(image.get('lines', []))
-                            ],
-                        )
-                        for index, image in enumerate(record.get('images', []))
+    def _cached_result(self, record: Dict[str, object]) -> AnalysisResult:
+        key = (record['animal_id'], record.get('generated_at'))
+        cached = self._result_cache.get(key)  # type: ignore[arg-type]
+        if cached is None:
+            cached = self._result_cache[key] = self._build_analysis_result(record)  # type: ignore[index]
+        return cached
+
+    def _build_analysis_result(self, record: Dict[str, object]) -> AnalysisResult:
+        animal_id: str = record['animal_id']  # type: ignore[assignment]
+        return AnalysisResult(
+            animal_id=animal_id,
+            generated_at=record.get('generated_at', self._now_iso()),  # type: ignore[arg-type]
+            images=[
+                AnalysisImageResult(
+                    image_id=image.get('image_id', ''),
+                    image_number=int(image.get('image_number', index + 1)),
+                    name=image.get('name', ''),
+                    average_mli_um=(
+                        float(image['average_mli_um']) if image.get('average_mli_um') is not None else None
+                    ),
+                    processed_image_path=image.get('processed_image_path', ''),
+                    threshold_image_path=(
+                        image.get('threshold_image_path')
+                        or image.get('processed_image_path', '')
+                    ),
+                    lines=[
+                        self._coerce_line(line, line_index + 1)
+                        for line_index, line in enumerate(image.get('lines', []))
                     ],
                 )
-                for record in results.values()
-            ]
+                for index, image in enumerate(record.get('images', []))  # type: ignore[arg-type]
+            ],
+        )
+
+    def get_results(self) -> List[AnalysisResult]:
+        with self.lock.read():
+            results: Dict[str, Dict[str, object]] = self._state['results']  # type: ignore[assignment]
+            return [self._cached_result(record) for record in results.values()]
 
     def get_result_for_animal(self, animal_id: str) -> Optional[AnalysisResult]:
-        with self.lock:
+        with self.lock.read():
             results: Dict[str, Dict[str, object]] = self._state['results']  # type: ignore[assignment]
             record = results.get(animal_id)
             if not record:
                 return None
-            return AnalysisResult(
-                animal_id=record['animal_id'],
-                generated_at=record.get('generated_at', datetime.utcnow().isoformat()),
-                images=[
-                    AnalysisImageResult(
-                        image_id=image.get('image_id', ''),
-                        image_number=int(image.get('image_number', index + 1)),
-                        name=image.get('name', ''),
-                        average_mli_um=(
-                            float(image['average_mli_um']) if image.get('average_mli_um') is not None else None
-                        ),
-                        processed_image_base64=image.get('processed_image_base64', ''),
-                        threshold_image_base64=(
-                            image.get('threshold_image_base64')
-                            or image.get('processed_image_base64', '')
-                        ),
-                        lines=[
-                            self._coerce_line(line, line_index + 1)
-                            for line_index, line in enumerate(image.get('lines', []))
-                        ],
-                    )
-                    for index, image in enumerate(record.get('images', []))
-                ],
-            )
\ No newline at end of file
+            return self._cached_result(record)
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from backend import storage
+from backend.storage import AnalysisImageResult, AnalysisResult, LineResult, StateManager
+
+
+def _abandon(manager: StateManager) -> None:
+    # Stop a manager the way a crash would: no final snapshot, and whatever is already on disk stays as it is.
+    with manager._snapshot_lock, manager.lock.write():
+        manager._closed = True
+        manager._journal.close()
+    manager._dirty.set()
+
+
+def _result(animal_id: str, generated_at: str, image_id: str) -> AnalysisResult:
+    line = LineResult(1, 3, 4, 10.0, 12.0, 22.0, 3.14)
+    image = AnalysisImageResult(image_id, 1, 'image.png', 3.14, 'blobs/p.png', 'blobs/t.png', [line])
+    return AnalysisResult(animal_id, generated_at, [image])
+
+
+class StateRecoveryTests(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.base_dir = Path(directory.name)
+
+    def _open(self) -> StateManager:
+        manager = StateManager(self.base_dir)
+        self.addCleanup(manager.close)
+        return manager
+
+    def test_torn_final_journal_line_is_truncated(self) -> None:
+        manager = self._open()
+        first = manager.add_image('a1', 'one.png', self.base_dir / 'one.png', 1)
+        second = manager.add_image('a1', 'two.png', self.base_dir / 'two.png', 2)
+        manager.flush()
+        _abandon(manager)
+        complete_size = manager.journal_path.stat().st_size
+        with manager.journal_path.open('ab') as handle:
+            handle.write(b'{"op":"set","section":"images","key":"torn')
+
+        reloaded = self._open()
+        self.assertEqual(manager.journal_path.stat().st_size, complete_size)
+        image_ids = [record.image_id for record in reloaded.get_images_for_animal('a1')]
+        self.assertEqual(image_ids, [first.image_id, second.image_id])
+
+        third = reloaded.add_image('a1', 'three.png', self.base_dir / 'three.png', 3)
+        reloaded.flush()
+        _abandon(reloaded)
+        self.assertIn(third.image_id, [record.image_id for record in self._open().get_images_for_animal('a1')])
+
+    def test_final_journal_entry_without_newline_is_truncated(self) -> None:
+        manager = self._open()
+        first = manager.add_image('a1', 'one.png', self.base_dir / 'one.png', 1)
+        manager.add_image('a1', 'two.png', self.base_dir / 'two.png', 2)
+        manager.flush()
+        _abandon(manager)
+        journal = manager.journal_path.read_bytes()
+        manager.journal_path.write_bytes(journal[:-1])
+
+        reloaded = self._open()
+        self.assertEqual(manager.journal_path.read_bytes(), journal[: journal.rindex(b'\n', 0, -1) + 1])
+        third = reloaded.add_image('a1', 'three.png', self.base_dir / 'three.png', 3)
+        fourth = reloaded.add_image('a1', 'four.png', self.base_dir / 'four.png', 4)
+        reloaded.flush()
+        _abandon(reloaded)
+
+        image_ids = [record.image_id for record in self._open().get_images_for_animal('a1')]
+        self.assertEqual(image_ids, [first.image_id, third.image_id, fourth.image_id])
+
+    def test_crash_between_snapshot_and_journal_rewrite_replays_cleanly(self) -> None:
+        manager = self._open()
+        kept = manager.add_image('a1', 'kept.png', self.base_dir / 'kept.png', 1)
+        moved = manager.add_image('a1', 'moved.png', self.base_dir / 'moved.png', 2)
+        removed = manager.add_image('a1', 'removed.png', self.base_dir / 'removed.png', 3)
+        manager.record_analysis(_result('a1', 'first', kept.image_id))
+        manager.clear_results()
+        manager.record_analysis(_result('a1', 'second', kept.image_id))
+        manager.move_image(moved.image_id, 'a2')
+        manager.remove_image(removed.image_id)
+        manager.flush()
+
+        # The snapshot lands but the journal still holds every entry it already covers.
+        with manager.lock.write():
+            manager._write_state(storage._dumps(manager._state))
+        manager.add_image('a2', 'late.png', self.base_dir / 'late.png', 4)
+        manager.flush()
+        _abandon(manager)
+
+        reloaded = self._open()
+        self.assertEqual(reloaded._state, manager._state)
+        self.assertEqual(reloaded.get_result_for_animal('a1').generated_at, 'second')  # type: ignore[union-attr]
+
+    def test_compaction_under_concurrent_writers_keeps_every_entry(self) -> None:
+        with mock.patch.object(storage, 'JOURNAL_SNAPSHOT_BYTES', 2048):
+            manager = self._open()
+            write_state = manager._write_state
+            late_image_ids = []
+
+            def write_state_with_late_append(payload: bytes) -> None:
+                # The flusher writes snapshots without the state lock, so mutators may append meanwhile.
+                write_state(payload)
+                late_image_ids.append(manager.add_image('late', 'late.png', self.base_dir / 'late.png', 0).image_id)
+
+            manager._write_state = write_state_with_late_append  # type: ignore[method-assign]
+
+            def write(worker: int) -> None:
+                for index in range(150):
+                    record = manager.add_image(f'a{worker}', 'image.png', self.base_dir / 'image.png', index)
+                    if index % 3 == 0:
+                        manager.move_image(record.image_id, f'b{worker}')
+                    if index % 5 == 0:
+                        manager.remove_image(record.image_id)
+                    if index % 7 == 0:
+                        manager.record_analysis(_result(f'a{worker}', str(index), record.image_id))
+
+            writers = [threading.Thread(target=write, args=(worker,)) for worker in range(4)]
+            for writer in writers:
+                writer.start()
+            for writer in writers:
+                writer.join()
+
+            deadline = time.monotonic() + 5
+            while not manager.state_path.exists() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertTrue(manager.state_path.exists(), 'journal was never compacted into a snapshot')
+            manager.flush()
+            _abandon(manager)
+
+            reloaded = self._open()
+            self.assertEqual(reloaded._state, manager._state)
+            self.assertTrue(late_image_ids)
+            self.assertEqual([record.image_id for record in reloaded.get_images_for_animal('late')], late_image_ids)
+
+
+if __name__ == '__main__':
+    unittest.main()
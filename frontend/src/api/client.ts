@@ -2,6 +2,8 @@ import axios from 'axios';
 
 const API_BASE_URL = import.meta.env.VITE_API_URL ?? 'http://localhost:8000';
 
+export const resolveApiUrl = (path: string) => `${API_BASE_URL}${path}`;
+
 export const apiClient = axios.create({
   baseURL: API_BASE_URL,
   timeout: 60_000,
@@ -13,6 +13,7 @@ import {
 import { useMutation } from '@tanstack/react-query';
 import { ConfigPanel } from './ConfigPanel';
 import type { AnalysisConfig, AnalysisImage } from '../types';
+import { resolveApiUrl } from '../api/client';
 import { previewAnalysis } from '../api/mli';
 
 export type AnalysisPreviewDialogProps = {
@@ -114,7 +115,7 @@ export const AnalysisPreviewDialog = ({
                       </Typography>
                       <Box
                         component="img"
-                        src={`data:image/png;base64,${preview?.processed_image_base64 ?? ''}`}
+                        src={preview ? resolveApiUrl(preview.processed_image_url) : ''}
                         alt={preview ? `Original overlay preview for ${animalLabel}` : 'Original overlay preview'}
                         sx={{ width: '100%', maxHeight: 260, objectFit: 'contain', bgcolor: 'black', borderRadius: 1 }}
                       />
@@ -125,7 +126,7 @@ export const AnalysisPreviewDialog = ({
                       </Typography>
                       <Box
                         component="img"
-                        src={`data:image/png;base64,${preview?.threshold_image_base64 ?? ''}`}
+                        src={preview ? resolveApiUrl(preview.threshold_image_url) : ''}
                         alt={preview ? `Threshold overlay preview for ${animalLabel}` : 'Threshold overlay preview'}
                         sx={{ width: '100%', maxHeight: 260, objectFit: 'contain', bgcolor: 'black', borderRadius: 1 }}
                       />
@@ -1,4 +1,5 @@
 import { Box, Button, Card, CardActions, CardContent, CardHeader, Grid, Stack, Typography } from '@mui/material';
+import { resolveApiUrl } from '../api/client';
 import type { AnalysisImage, AnalysisResult } from '../types';
 
 export type ProcessedImageGalleryProps = {
@@ -23,8 +24,8 @@ export const ProcessedImageGallery = ({ results, onPreviewRequest }: ProcessedIm
       imageNumber: image.image_number,
       imageName: image.name,
       averageMli: image.average_mli_um,
-      processedBase64: image.processed_image_base64,
-      thresholdBase64: image.threshold_image_base64,
+      processedUrl: resolveApiUrl(image.processed_image_url),
+      thresholdUrl: resolveApiUrl(image.threshold_image_url),
       lineCount: image.lines.length,
       animalId: result.animal_id,
       data: image,
@@ -46,7 +47,7 @@ export const ProcessedImageGallery = ({ results, onPreviewRequest }: ProcessedIm
                   <Box
                     component="img"
                     sx={{ width: '100%', maxHeight: 240, objectFit: 'contain', bgcolor: 'black', borderRadius: 1 }}
-                    src={`data:image/png;base64,${item.processedBase64}`}
+                    src={item.processedUrl}
                     alt={`Processed grid overlay for ${item.animalLabel}, image ${item.imageNumber} (${item.imageName})`}
                   />
                 </Stack>
@@ -57,7 +58,7 @@ export const ProcessedImageGallery = ({ results, onPreviewRequest }: ProcessedIm
                   <Box
                     component="img"
                     sx={{ width: '100%', maxHeight: 240, objectFit: 'contain', bgcolor: 'black', borderRadius: 1 }}
-                    src={`data:image/png;base64,${item.thresholdBase64}`}
+                    src={item.thresholdUrl}
                     alt={`Threshold overlay for ${item.animalLabel}, image ${item.imageNumber} (${item.imageName})`}
                   />
                 </Stack>
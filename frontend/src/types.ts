@@ -59,8 +59,8 @@ export type AnalysisImage = {
   image_number: number;
   name: string;
   average_mli_um: number | null;
-  processed_image_base64: string;
-  threshold_image_base64: string;
+  processed_image_url: string;
+  threshold_image_url: string;
   lines: LineResult[];
 };
 